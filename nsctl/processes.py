@@ -1,6 +1,7 @@
-import os, shlex, subprocess, shutil
+import os, sys, shlex, subprocess, shutil, functools, atexit, threading, time
+import concurrent.futures
 import psutil
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from typing import Literal
 
 try:
@@ -14,6 +15,119 @@ from nsctl.utils import get_uid, get_gid, check_ops
 
 Escalate = Literal["sudo", "pkexec", None]
 
+# Characters which make shlex.split differ from str.split on ASCII input: quotes,
+# escapes, and the whitespace str.split splits on but shlex (" \t\r\n") doesn't
+_SHLEX_SPECIAL = "\"'\\\x0b\x0c\x1c\x1d\x1e\x1f"
+
+
+# Helpers are resolved to absolute paths once at import, PATH is assumed stable
+# for the process lifetime.
+_NSENTER = shutil.which("nsenter") or "nsenter"
+_ESCALATORS: dict[str, str | None] = {k: shutil.which(k) for k in ("sudo", "pkexec")}
+
+_AM_ROOT = os.geteuid() == 0
+
+# Fixed argv prefixes
+_NSENTER_PREFIX = (_NSENTER, "-t")
+_ESCALATE_PREFIX: dict[str, tuple[str, str]] = {
+    k: (path, "-n") for k, path in _ESCALATORS.items() if path is not None }
+
+
+# Namespace kinds entered by `nsenter --all`
+_NS_KINDS = ("cgroup", "ipc", "mnt", "net", "pid", "time", "user", "uts")
+
+
+def _read_ns_ids(pid: int | str) -> dict[str, str]:
+    """Map namespace kind -> `/proc/<pid>/ns/<kind>` link (e.g. `net:[4026531840]`)."""
+    ids: dict[str, str] = {}
+    for kind in _NS_KINDS:
+        try:
+            ids[kind] = os.readlink(f"/proc/{pid}/ns/{kind}")
+        except FileNotFoundError:
+            # Namespace kind not supported by this kernel
+            continue
+    return ids
+
+
+try:
+    _SELF_NS = _read_ns_ids("self")
+except OSError:
+    _SELF_NS = {}
+
+
+def _shares_namespaces(pid: int) -> bool:
+    """True if we are already in every namespace of `pid`, making nsenter a no-op."""
+    if not _SELF_NS:
+        return False
+    try:
+        return _read_ns_ids(pid) == _SELF_NS
+    except OSError:
+        # Can't inspect the target (e.g. not permitted), let nsenter handle it
+        return False
+
+
+@functools.lru_cache(maxsize=64)
+def _resolve_user(name: str) -> tuple[int, int]:
+    """Memoized (uid, gid) lookup for `name`, avoids repeat NSS queries."""
+    return (get_uid(name), get_gid(name))
+
+
+def _build_cmd_args(cmd: Sequence[str] | str,
+                    *,
+                    ns_pid: int | None = None,
+                    working_dir: str | None = None,
+                    escalate: Escalate = None,
+                    as_user: str | None = None,
+                    ) -> tuple[list[str], str | None]:
+    """
+    Build the final argv: `[escalate] [nsenter ...] cmd`. Also returns the
+    directory the child must be started in (`cwd`), for when `working_dir` was
+    requested but isn't carried by nsenter's `--wd=`.
+    """
+    if isinstance(cmd, str):
+        if not cmd.isascii() or any(c in cmd for c in _SHLEX_SPECIAL):
+            cmd_tokens: Sequence[str] = shlex.split(cmd)
+        else:
+            # ASCII with no quoting, escapes or exotic whitespace, str.split
+            # is equivalent
+            cmd_tokens = cmd.split()
+    else:
+        cmd_tokens = cmd
+
+    cmd_args: list[str] = []
+    cwd: str | None = None
+
+    # ----------------------- escalate --------------------------
+    # Already root, sudo/pkexec would only cost an extra exec
+    if escalate is not None and not _AM_ROOT:
+        prefix = _ESCALATE_PREFIX.get(escalate)
+        if prefix is None:
+            raise RuntimeError(f"{escalate} not found in PATH; cannot escalate")
+        cmd_args.extend(prefix)
+
+    # ----------------------- nsenter --------------------------
+    # Skip nsenter when already inside the target namespaces, unless it is
+    # also needed to switch user.
+    if ns_pid is not None and (as_user or not _shares_namespaces(ns_pid)):
+        cmd_args.extend(_NSENTER_PREFIX)
+        cmd_args.extend((str(ns_pid), "--all"))
+        if working_dir is None:
+            # Only resolved when nsenter actually needs it
+            working_dir = os.getcwd()
+        if working_dir:
+            cmd_args.append(f"--wd={working_dir}")
+        if as_user:
+            uid, gid = _resolve_user(as_user)
+            cmd_args.extend((f"--setuid={uid}", f"--setgid={gid}"))
+        cmd_args.append("--")
+    else:
+        # No nsenter (no namespace, or already inside it), start the child in
+        # the requested directory directly
+        cwd = working_dir
+
+    cmd_args.extend(cmd_tokens)
+    return (cmd_args, cwd)
+
 
 def _exec_cmd(cmd: list[str] | str,
               *,
@@ -31,45 +145,45 @@ def _exec_cmd(cmd: list[str] | str,
               escalate: Escalate = None,
               as_user: str | None = None,
               passthrough: bool = False,
+              new_session: bool = True,
+              close_fds: bool = True,
+              discard_output: bool = False,
               ) -> subprocess.CompletedProcess[str] | subprocess.Popen[str] | None:
     """
     Bottom level executor
     * `detach=True` -> returns immediately with `popen` handle; `capture_output`
                        must be false
     * `ns_pid`      -> if provided, prepends `nsenter -t <pid> --all --`.
+    * `working_dir` -> directory to run in. Passed to nsenter as `--wd=`
+                       (defaulting to the current directory), otherwise used
+                       as the child's `cwd`.
     * `escalate`    -> prepend `sudo -n` or `pkexec` **once**, *before* nsenter.
     * `as_user`     -> translate to `--setuid/--setgid` when using nsenter.
+    * `new_session` -> with `detach=True`, start the child in its own session so
+                       it survives the terminal closing. CPython only launches
+                       via `posix_spawn` when this is off, `close_fds` is off
+                       and the executable path has a directory component.
+    * `close_fds`   -> passed to Popen. Python opened fds are non-inheritable
+                       (PEP 446), so callers that hold no deliberately
+                       inheritable fds may skip the close loop.
+    * `discard_output` -> send stdout/stderr to /dev/null instead of inheriting
+                       ours; can't be combined with `capture_output`.
     """
     # ----------------------- validate --------------------------
     if detach and capture_output:
         raise ValueError("Cannot use detach=True with capture_output=True.")
-    if isinstance(cmd, str):
-        cmd_args: list[str] = shlex.split(cmd)
-    else:
-        cmd_args = list(cmd)
-
-    # ----------------------- nsenter --------------------------
-    if ns_pid is not None:
-        ns_cmd = ["nsenter", "-t", str(ns_pid), "--all"]
-        if working_dir:
-            ns_cmd.append(f"--wd={working_dir}")
-        if as_user:
-            uid = get_uid(as_user)
-            gid = get_gid(as_user)
-            ns_cmd += [f"--setuid={uid}", f"--setgid={gid}"]
-        ns_cmd.append("--")
-        cmd_args = ns_cmd + cmd_args
-
-    # ----------------------- escalate --------------------------
-    if escalate is not None:
-        helper = shutil.which(escalate)
-        if helper is None:
-            raise RuntimeError(f"{escalate} not found in PATH; cannot escalate")
-        cmd_args = [helper, "-n"] + cmd_args
+    if discard_output and capture_output:
+        raise ValueError("Cannot use discard_output=True with capture_output=True.")
+    cmd_args, cwd = _build_cmd_args(
+        cmd,
+        ns_pid=ns_pid,
+        working_dir=working_dir,
+        escalate=escalate,
+        as_user=as_user)
 
     # ----------------------- dry-run --------------------------
     if dry_run:
-        print("DRY-RUN:", " ".join(cmd_args))
+        print("DRY-RUN:", shlex.join(cmd_args))
         return None
 
     # ----------------------- execution path --------------------------
@@ -82,21 +196,26 @@ def _exec_cmd(cmd: list[str] | str,
             stdout = None
             stderr = None
         if verbose:
-            print(f"DETACH: {' '.join(cmd_args)}")
+            print("DETACH:", *cmd_args)
         return subprocess.Popen(
             cmd_args,
             stdout=stdout,
             stderr=stderr,
             stdin=stdin,
             env=env,
-            start_new_session=True,
+            cwd=cwd,
+            start_new_session=new_session,
+            close_fds=close_fds,
             text=True,
         )
     if verbose:
-        print(f"RUN: {' '.join(cmd_args)}")
+        print("RUN:", *cmd_args)
     stdin = None
     stdout = None
     stderr = None
+    if discard_output:
+        stdout = subprocess.DEVNULL
+        stderr = subprocess.DEVNULL
     return subprocess.run(
         cmd_args,
         text=True,
@@ -105,7 +224,9 @@ def _exec_cmd(cmd: list[str] | str,
         stderr=stderr,
         capture_output=capture_output,
         env=env,
-        check=check
+        cwd=cwd,
+        check=check,
+        close_fds=close_fds,
     )
 
 
@@ -119,30 +240,64 @@ def handle_ns(ns: NSInfo|None, escalate: Escalate = None) -> tuple[int|None,Esca
     return (ns.pid, escalate)
 
 
-def run(cmd: list[str] | str,
-        *,
-        dry_run: bool = False,
-        verbose: bool = False,
-        env: Mapping[str, str] | None = None,
-        escalate: Escalate = None,
-        ns: NSInfo|None = None,
-        as_user: str|None = None,) -> None:
-    work_dir = os.getcwd()
+def _dispatch(cmd: list[str] | str,
+              *,
+              capture: bool = False,
+              check: bool = False,
+              detach: bool = False,
+              passthrough: bool = False,
+              dry_run: bool = False,
+              verbose: bool = False,
+              env: Mapping[str, str] | None = None,
+              escalate: Escalate = None,
+              ns: NSInfo|None = None,
+              as_user: str|None = None,
+              working_dir: str|None = None,
+              new_session: bool = True,
+              close_fds: bool = True,
+              discard_output: bool = False,
+              ) -> subprocess.CompletedProcess[str] | subprocess.Popen[str] | None:
+    """Common path of the public wrappers, resolves `ns` and escalation."""
     ns_pid, escalate = handle_ns(ns, escalate)
 
-    _ = _exec_cmd(
+    return _exec_cmd(
         cmd,
-        capture_output=False,
-        check=False,
+        detach=detach,
+        capture_output=capture,
+        check=check,
         env=env,
         escalate=escalate,
         dry_run=dry_run,
         verbose=verbose,
         ns_pid=ns_pid,
         as_user=as_user,
-        working_dir=work_dir,
+        working_dir=working_dir,
+        passthrough=passthrough,
+        new_session=new_session,
+        close_fds=close_fds,
+        discard_output=discard_output,
     )
 
+
+def run(cmd: list[str] | str,
+        *,
+        dry_run: bool = False,
+        verbose: bool = False,
+        env: Mapping[str, str] | None = None,
+        escalate: Escalate = None,
+        ns: NSInfo|None = None,
+        as_user: str|None = None,
+        working_dir: str|None = None,
+        discard_output: bool = False,) -> None:
+    """
+    Runs a command, ignoring failures.
+    `working_dir` is the directory to run in, defaulting to the current one.
+    """
+    _ = _dispatch(cmd, dry_run=dry_run, verbose=verbose, env=env, escalate=escalate,
+                  ns=ns, as_user=as_user,
+                  working_dir=working_dir, close_fds=False, discard_output=discard_output)
+
+
 def run_check(cmd: list[str] | str,
               *,
               dry_run: bool = False,
@@ -150,22 +305,17 @@ def run_check(cmd: list[str] | str,
               env: Mapping[str, str] | None = None,
               escalate: Escalate = None,
               ns: NSInfo|None = None,
-              as_user: str|None = None,) -> None:
-    work_dir = os.getcwd()
-    ns_pid, escalate = handle_ns(ns, escalate)
-
-    _ = _exec_cmd(
-        cmd,
-        capture_output=False,
-        check=True,
-        env=env,
-        escalate=escalate,
-        dry_run=dry_run,
-        verbose=verbose,
-        ns_pid=ns_pid,
-        as_user=as_user,
-        working_dir=work_dir,
-    )
+              as_user: str|None = None,
+              working_dir: str|None = None,
+              discard_output: bool = False,) -> None:
+    """
+    Runs a command and raises if it fails.
+    `working_dir` is the directory to run in, defaulting to the current one.
+    """
+    _ = _dispatch(cmd, check=True, dry_run=dry_run, verbose=verbose, env=env,
+                  escalate=escalate, ns=ns, as_user=as_user,
+                  working_dir=working_dir, close_fds=False,
+                  discard_output=discard_output)
 
 
 class RunCheckOutputArgs(TypedDict):
@@ -175,6 +325,7 @@ class RunCheckOutputArgs(TypedDict):
     escalate: NotRequired[Escalate]
     ns: NotRequired[NSInfo]
     as_user: NotRequired[str]
+    working_dir: NotRequired[str]
 
 
 def run_check_output(cmd: list[str] | str,
@@ -184,25 +335,20 @@ def run_check_output(cmd: list[str] | str,
               env: Mapping[str, str] | None = None,
               escalate: Escalate = None,
               ns: NSInfo|None = None,
-              as_user: str|None = None,) -> str:
-    """Runs a command, checks if the command failed, and returns the return code."""
-    work_dir = os.getcwd()
-    ns_pid, escalate = handle_ns(ns, escalate)
-
-    result = _exec_cmd(
-        cmd,
-        capture_output=True,
-        check=True,
-        env=env,
-        escalate=escalate,
-        dry_run=dry_run,
-        verbose=verbose,
-        ns_pid=ns_pid,
-        as_user=as_user,
-        working_dir=work_dir,
-    )
-
-    if type(result) is not subprocess.CompletedProcess:
+              as_user: str|None = None,
+              working_dir: str|None = None,) -> str:
+    """
+    Runs a command, checks if the command failed, and returns its output.
+    `working_dir` is the directory to run in, defaulting to the current one.
+    """
+    result = _dispatch(cmd, capture=True, check=True, dry_run=dry_run, verbose=verbose,
+                       env=env, escalate=escalate, ns=ns, as_user=as_user,
+                       working_dir=working_dir)
+
+    if result is None:
+        # dry-run, nothing was executed
+        return ""
+    if not isinstance(result, subprocess.CompletedProcess):
         raise RuntimeError(f"Expected CompletedProcess, got {type(result)}")
 
     return result.stdout
@@ -215,25 +361,20 @@ def run_code_output(cmd: list[str] | str,
               env: Mapping[str, str] | None = None,
               escalate: Escalate = None,
               ns: NSInfo|None = None,
-              as_user: str|None = None,) -> tuple[int,str]:
-    """Runs a command, checks if the command failed, and returns the return code."""
-    work_dir = os.getcwd()
-    ns_pid, escalate = handle_ns(ns, escalate)
-
-    result = _exec_cmd(
-        cmd,
-        capture_output=True,
-        check=True,
-        env=env,
-        escalate=escalate,
-        dry_run=dry_run,
-        verbose=verbose,
-        ns_pid=ns_pid,
-        as_user=as_user,
-        working_dir=work_dir,
-    )
-
-    if type(result) is not subprocess.CompletedProcess:
+              as_user: str|None = None,
+              working_dir: str|None = None,) -> tuple[int,str]:
+    """
+    Runs a command, checks if the command failed, and returns the return code.
+    `working_dir` is the directory to run in, defaulting to the current one.
+    """
+    result = _dispatch(cmd, capture=True, check=True, dry_run=dry_run, verbose=verbose,
+                       env=env, escalate=escalate, ns=ns, as_user=as_user,
+                       working_dir=working_dir)
+
+    if result is None:
+        # dry-run, nothing was executed
+        return (0, "")
+    if not isinstance(result, subprocess.CompletedProcess):
         raise RuntimeError(f"Expected CompletedProcess, got {type(result)}")
 
     return (result.returncode, result.stdout)
@@ -246,25 +387,22 @@ def run_check_code(cmd: list[str] | str,
                    env: Mapping[str, str] | None = None,
                    escalate: Escalate = None,
                    ns: NSInfo|None = None,
-                   as_user: str|None = None,) -> int:
-    """Runs a command, checks if the command failed, and returns the return code."""
-    work_dir = os.getcwd()
-    ns_pid, escalate = handle_ns(ns, escalate)
-
-    result = _exec_cmd(
-        cmd,
-        capture_output=False,
-        check=True,
-        env=env,
-        escalate=escalate,
-        dry_run=dry_run,
-        verbose=verbose,
-        ns_pid=ns_pid,
-        as_user=as_user,
-        working_dir=work_dir,
-    )
-
-    if type(result) is not subprocess.CompletedProcess:
+                   as_user: str|None = None,
+                   working_dir: str|None = None,
+                   discard_output: bool = False,) -> int:
+    """
+    Runs a command, checks if the command failed, and returns the return code.
+    `working_dir` is the directory to run in, defaulting to the current one.
+    """
+    result = _dispatch(cmd, check=True, dry_run=dry_run, verbose=verbose, env=env,
+                       escalate=escalate, ns=ns, as_user=as_user,
+                       working_dir=working_dir,
+                       discard_output=discard_output)
+
+    if result is None:
+        # dry-run, nothing was executed
+        return 0
+    if not isinstance(result, subprocess.CompletedProcess):
         raise RuntimeError(f"Expected CompletedProcess, got {type(result)}")
 
     return result.returncode
@@ -277,28 +415,22 @@ def run_code_passthrough(cmd: list[str] | str,
                          env: Mapping[str, str] | None = None,
                          escalate: Escalate = None,
                          ns: NSInfo|None = None,
-                         as_user: str|None = None,) -> int:
-    """Runs a command, checks if the command failed, and returns the return code."""
-    work_dir = os.getcwd()
-    ns_pid, escalate = handle_ns(ns, escalate)
-
+                         as_user: str|None = None,
+                         working_dir: str|None = None,) -> int:
+    """
+    Runs a command, checks if the command failed, and returns the return code.
+    `working_dir` is the directory to run in, defaulting to the current one.
+    """
     # We don't throw an error if the command fails
     # We don't capture the output
-    result = _exec_cmd(
-        cmd,
-        capture_output=False,
-        check=False,
-        env=env,
-        escalate=escalate,
-        dry_run=dry_run,
-        verbose=verbose,
-        ns_pid=ns_pid,
-        as_user=as_user,
-        working_dir=work_dir,
-        passthrough=True,
-    )
-
-    if type(result) is not subprocess.CompletedProcess:
+    result = _dispatch(cmd, passthrough=True, dry_run=dry_run, verbose=verbose, env=env,
+                       escalate=escalate, ns=ns, as_user=as_user,
+                       working_dir=working_dir)
+
+    if result is None:
+        # dry-run, nothing was executed
+        return 0
+    if not isinstance(result, subprocess.CompletedProcess):
         raise RuntimeError(f"Expected CompletedProcess, got {type(result)}")
 
     return result.returncode
@@ -311,24 +443,18 @@ def detach(
         env: Mapping[str, str] | None = None,
         escalate: Escalate = None,
         ns: NSInfo|None = None,
-        as_user: str|None = None,) -> subprocess.Popen[str]:
-    
-    work_dir = os.getcwd()
-    ns_pid, escalate = handle_ns(ns, escalate)
-
-    result = _exec_cmd(
-        cmd,
-        detach=True,
-        capture_output=False,
-        check=False,
-        env=env,
-        escalate=escalate,
-        dry_run=dry_run,
-        verbose=verbose,
-        ns_pid=ns_pid,
-        as_user=as_user,
-        working_dir=work_dir,
-    )
+        as_user: str|None = None,
+        working_dir: str|None = None,
+        new_session: bool = True,
+        close_fds: bool = True,) -> subprocess.Popen[str]:
+    """
+    Starts a command in the background.
+    `working_dir` is the directory to run in, defaulting to the current one.
+    """
+    result = _dispatch(cmd, detach=True, dry_run=dry_run, verbose=verbose, env=env,
+                       escalate=escalate, ns=ns, as_user=as_user,
+                       working_dir=working_dir, new_session=new_session,
+                       close_fds=close_fds)
 
     if not isinstance(result, subprocess.Popen):
         raise RuntimeError(f"Expected Popen, got {type(result)}")
@@ -344,8 +470,18 @@ def detach_and_check(
         escalate: Escalate = None,
         ns: NSInfo|None = None,
         as_user: str|None = None,
-        wait_time: float = 1.) -> subprocess.Popen[str]:
-    
+        working_dir: str|None = None,
+        new_session: bool = True,
+        close_fds: bool = True,
+        wait_time: float | None = None,
+        settle_time: float = 0.05) -> subprocess.Popen[str]:
+    """
+    Detach a command and check that it didn't exit straight away. The child is
+    polled with exponential backoff and must stay alive for `wait_time`
+    seconds. When `wait_time` isn't given, a short `settle_time` window is used
+    instead, which only catches commands failing on startup. `working_dir` is
+    the directory to run in, defaulting to the current one.
+    """
     process = detach(
         cmd,
         dry_run=dry_run,
@@ -353,45 +489,186 @@ def detach_and_check(
         env=env,
         escalate=escalate,
         ns=ns,
-        as_user=as_user)
+        as_user=as_user,
+        working_dir=working_dir,
+        new_session=new_session,
+        close_fds=close_fds)
 
     # Wait for the process to start, and check that it didn't fail
-    try:
-        returncode = process.wait(timeout=wait_time)
-        raise RuntimeError(
-            f"Detached process exited immediately, indicating failure. returncode was: {returncode}")
-    except subprocess.TimeoutExpired:
-        pass
+    window = settle_time if wait_time is None else wait_time
+    deadline = time.monotonic() + window
+    delay = 0.01
+    while True:
+        returncode = process.poll()
+        if returncode is not None:
+            raise RuntimeError(
+                f"Detached process exited immediately, indicating failure. returncode was: {returncode}")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay *= 2
 
     return process
 
 
+_POOL_WORKERS = min(32, (os.cpu_count() or 4)*4)
+_pool: concurrent.futures.ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """Lazily created worker pool, kept for the process lifetime."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_POOL_WORKERS,
+                thread_name_prefix="nsctl-run")
+            _ = atexit.register(_pool.shutdown)
+        return _pool
+
+
+def _run_one(cmd_args: list[str],
+             cwd: str | None,
+             env: Mapping[str, str] | None) -> tuple[int, str]:
+    # Only stdout is captured, stderr is left on ours so failures stay visible
+    try:
+        result = subprocess.run(
+            cmd_args,
+            text=True,
+            stdout=subprocess.PIPE,
+            env=env,
+            cwd=cwd,
+            check=False)
+    except OSError as e:
+        # Couldn't start it at all, report like a shell would (127 for a
+        # missing command, 126 otherwise) instead of failing the whole batch
+        print(f"{cmd_args[0]}: {e}", file=sys.stderr)
+        return (127 if isinstance(e, FileNotFoundError) else 126, "")
+    return (result.returncode, result.stdout)
+
+
+def run_many(cmds: Sequence[Sequence[str] | str],
+             *,
+             max_parallel: int | None = None,
+             dry_run: bool = False,
+             verbose: bool = False,
+             env: Mapping[str, str] | None = None,
+             escalate: Escalate = None,
+             ns: NSInfo|None = None,
+             as_user: str|None = None,
+             working_dir: str|None = None,) -> list[tuple[int,str]]:
+    """
+    Runs independent commands concurrently on a shared thread pool, at most
+    `max_parallel` at a time (defaults to the cpu count, and can't exceed the
+    pool size of `min(32, 4*cpu count)`). Returns
+    `(returncode, stdout)` for each command, in the order given. Failing
+    commands don't raise, their stderr goes to ours; commands which can't be
+    started report 127 (not found) or 126 (any other OS error). `working_dir` is the
+    directory to run in, defaulting to the current one.
+    """
+    if max_parallel is None:
+        max_parallel = os.cpu_count() or 1
+    if max_parallel < 1:
+        raise ValueError(f"max_parallel must be at least 1, got {max_parallel}")
+    # Workers beyond the pool size don't exist, so higher limits have no effect
+    max_parallel = min(max_parallel, _POOL_WORKERS)
+    ns_pid, escalate = handle_ns(ns, escalate)
+
+    all_args = [
+        _build_cmd_args(
+            cmd,
+            ns_pid=ns_pid,
+            working_dir=working_dir,
+            escalate=escalate,
+            as_user=as_user)
+        for cmd in cmds ]
+
+    if dry_run:
+        for cmd_args, _ in all_args:
+            print("DRY-RUN:", shlex.join(cmd_args))
+        return [ (0, "") for _ in all_args ]
+
+    if verbose:
+        for cmd_args, _ in all_args:
+            print("RUN:", *cmd_args)
+
+    # The children do the work, so threads are enough to overlap them
+    # max_parallel is enforced here, by never having more than that many of
+    # our commands submitted, so pool workers are never held by this batch
+    pool = _get_pool()
+    results: list[tuple[int, str]] = [ (0, "") ] * len(all_args)
+    pending: dict[concurrent.futures.Future[tuple[int, str]], int] = {}
+    for i, (cmd_args, cwd) in enumerate(all_args):
+        if len(pending) >= max_parallel:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for f in done:
+                results[pending.pop(f)] = f.result()
+        pending[pool.submit(_run_one, cmd_args, cwd, env)] = i
+    for f in concurrent.futures.as_completed(pending):
+        results[pending[f]] = f.result()
+    return results
+
+
 def find_bottom_children(pid: int) -> list[psutil.Process]:
     """
-    Recursively returns a list of all leaf (bottom-most) processes
+    Returns a list of all leaf (bottom-most) processes
     in the process tree rooted at `pid`.
     """
     try:
-        process = psutil.Process(pid)
+        root = psutil.Process(pid)
+        # A single pass over /proc builds the whole descendant set
+        descendants = root.children(recursive=True)
     except (psutil.NoSuchProcess, psutil.AccessDenied):
         return []
 
-    children = process.children()
-    if not children:
+    if not descendants:
         # This process has no children, so it's a bottom-most process
-        return [process]
+        return [root]
 
-    # Otherwise, collect bottom-most children of each child
-    bottom: list[psutil.Process] = []
-    for child in children:
-        bottom.extend(find_bottom_children(child.pid))
-    return bottom
-
-
-def process_exists(pid: int):
-    if os.path.exists(f"/proc/{pid}"):
+    # Walk the flat descendant list iteratively rather than recursing per node;
+    # any process which is the parent of another descendant is not a leaf.
+    parents: set[int] = {pid}
+    alive: list[psutil.Process] = []
+    for child in descendants:
         try:
-            process = psutil.Process(pid)
-            return process.is_running()
+            parents.add(child.ppid())
         except psutil.NoSuchProcess:
-            return False
+            # Exited since the walk, don't report it as a leaf
+            continue
+        except psutil.AccessDenied:
+            # Without its parent the leaf set can't be trusted; its parent
+            # would be reported as a leaf. Fail the same way as for the root.
+            return []
+        alive.append(child)
+
+    return [child for child in alive if child.pid not in parents]
+
+
+def process_exists(pid: int) -> bool:
+    # kill() treats 0 and negative pids as process groups / every process
+    if pid <= 0:
+        return False
+    # Signal 0 performs the existence/permission checks without sending anything
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists, it just belongs to someone else
+        return True
+    return True
+
+
+def process_is_same(pid: int, create_time: float) -> bool:
+    """
+    Checks that `pid` is still the process incarnation started at
+    `create_time` (as reported by `psutil.Process.create_time`), guarding
+    against pid reuse.
+    """
+    try:
+        return psutil.Process(pid).create_time() == create_time
+    except psutil.NoSuchProcess:
+        return False
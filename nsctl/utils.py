@@ -1,4 +1,5 @@
 from enum import IntEnum, unique
+import functools
 import os
 from nsctl.config import Namespaces
 
@@ -61,10 +62,6 @@ def check_ops(ops: list[str] | Namespaces, which: str = "effective") -> bool:
     """
     which ∈ {'inheritable','permitted','effective'}
     """
-    caps = Capabilities()
-    if os.geteuid() == 0:
-        return True
-
     ops_l: list[str] = []
 
     if isinstance(ops, Namespaces):
@@ -77,7 +74,20 @@ def check_ops(ops: list[str] | Namespaces, which: str = "effective") -> bool:
     else:
         ops_l = ops
 
-    for op in ops_l:
+    return _check_ops_cached(tuple(sorted(set(ops_l))), which)
+
+
+@functools.lru_cache(maxsize=32)
+def _check_ops_cached(ops: tuple[str, ...], which: str) -> bool:
+    """
+    Our capabilities don't change over the process lifetime, so the answer
+    for a given set of operations is memoized.
+    """
+    if os.geteuid() == 0:
+        return True
+
+    caps = Capabilities()
+    for op in ops:
         for req in REQUIRED[op]:
             if not caps.has(req, which=which):
                 return False